@@ -1,28 +1,58 @@
+import time
+_import_started = time.perf_counter()
+
+import asyncio
 import json
-import re
-from typing import Dict, List, Optional, Any
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Any
 from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Response, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.requests import Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from openai import OpenAI
 import os
 from pathlib import Path
 import shutil
 import httpx
+from har_analyzer import DEFAULT_MODEL, analyze_with_llm, extract_request_details, filter_har_entries, generate_curl_command, get_client
+from proxy_cache import ProxyCache
 
-# Load environment variables
-import configparser
-config = configparser.ConfigParser()
-config.read('config.ini')
-api_key = config.get('openai', 'api_key')
-client = OpenAI(api_key=api_key)
+# Importing this module should stay cheap; heavy clients are built lazily
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "1.5"))
 
 TEMP_DIR = Path("./temp_uploads")
 TEMP_DIR.mkdir(exist_ok=True)
 upload_tracking: Dict[str, Dict[str, Any]] = {}
-app = FastAPI()
+
+# Opt-in response cache for idempotent /proxy requests; a request can override with "cache": true/false
+PROXY_CACHE_ENABLED = os.environ.get("PROXY_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+proxy_cache = ProxyCache(
+    max_bytes=int(os.environ.get("PROXY_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    vary_headers=os.environ.get("PROXY_CACHE_VARY_HEADERS", "accept,authorization,cookie").split(","),
+)
+
+startup_state: Dict[str, Any] = {"ready": False, "error": None, "import_seconds": None, "warmup_seconds": None}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the OpenAI client in the background so the server can accept connections immediately."""
+    async def warm_up():
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(get_client)
+            startup_state["ready"] = True
+        except Exception as e:
+            print(f"Error initializing OpenAI client: {e}")
+            startup_state["error"] = str(e)
+        startup_state["warmup_seconds"] = round(time.perf_counter() - started, 3)
+
+    task = asyncio.create_task(warm_up())
+    yield
+    task.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Add CORS middleware to allow requests from your Next.js frontend
 app.add_middleware(
@@ -46,134 +76,20 @@ class FinalizeUpload(BaseModel):
     filename: str
 
 
-def filter_har_entries(entries: List[Dict]) -> List[Dict]:
-    """Filter HAR entries to keep only API calls and remove HTML, CSS, etc."""
-    api_entries = []
-    
-    for entry in entries:
-        # Skip entries that don't have response
-        if "response" not in entry or "content" not in entry["response"]:
-            continue
-            
-        # Skip entries that return HTML
-        content_type = entry["response"].get("content", {}).get("mimeType", "")
-        if "html" in content_type.lower():
-            continue
-            
-        # Skip image, font, stylesheet requests
-        if any(x in content_type.lower() for x in ["image", "font", "css"]):
-            continue
-            
-        # Keep entries that are likely APIs
-        if (
-            "json" in content_type.lower() or 
-            "xml" in content_type.lower() or 
-            "javascript" in content_type.lower() or 
-            "api" in entry["request"]["url"].lower()
-        ):
-            api_entries.append(entry)
-    
-    return api_entries
-
-
-def generate_curl_command(entry: Dict) -> str:
-    """Generate a curl command from the full HAR entry."""
-    request = entry["request"]
-    method = request["method"]
-    url = request["url"]
-    
-    curl_parts = [f"curl -X {method} '{url}'"]
-    
-    # Add headers
-    for header in request["headers"]:
-        name = header["name"]
-        value = header["value"].replace("'", "'\\''")  # Escape single quotes
-        curl_parts.append(f"-H '{name}: {value}'")
-    
-    # Add data if present
-    if "postData" in request:
-        if "text" in request["postData"]:
-            data = request["postData"]["text"].replace("'", "'\\''")
-            curl_parts.append(f"-d '{data}'")
-        elif "params" in request["postData"]:
-            for param in request["postData"]["params"]:
-                name = param["name"]
-                value = param["value"].replace("'", "'\\''")
-                curl_parts.append(f"-F '{name}={value}'")
-    
-    return " \\\n  ".join(curl_parts)
-
-
-async def analyze_with_llm(api_entries: List[Dict], description: str, selectedModel: str) -> Dict:
-    """Use OpenAI to select the most relevant API request from all entries."""
-    # Create simplified entries for use in the LLM prompt to reduce token usage
-    simplified_entries = []
-    for i, entry in enumerate(api_entries):
-        simplified = {
-            "index": i,
-            "method": entry["request"]["method"],
-            "url": entry["request"]["url"],
-            "contentType": next((h["value"] for h in entry["request"]["headers"] 
-                             if h["name"].lower() == "content-type"), "None")
-        }
-        simplified_entries.append(simplified)
-    
-    # Prepare the prompt with all entries in simplified form
-    prompt = f"""
-        You are an expert at analyzing API requests. I need you to find the most relevant API request from a HAR file based on this description:
-
-        "{description}"
-
-        Here are all the API requests found in the HAR file (simplified to save tokens):
-        {json.dumps(simplified_entries, indent=2)}
-
-        Please identify the SINGLE most relevant request that best matches the description. 
-        Return ONLY a JSON object with the following structure:
-        {{
-        "selected_index": [index of the selected request in the provided array],
-        "reasoning": "Brief explanation of why this request matches the description"
-        }}
-        """
-
-    try:
-        if selectedModel == "gpt-4o-2024-08-06":
-            response = client.chat.completions.create(
-            model=selectedModel,
-            messages=[
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7
-        )
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
 
 
-        else:
-            response = client.chat.completions.create(
-                model=selectedModel,
-                messages=[{"role": "user", "content": prompt}],
-            )
-        
-        result_text = response.choices[0].message.content
-        
-        # Use regex to extract JSON object from the response
-        json_match = re.search(r'\{[\s\S]*\}', result_text)
-        if json_match:
-            result = json.loads(json_match.group(0))
-            selected_index = result.get("selected_index")
-            
-            if selected_index is not None and 0 <= selected_index < len(api_entries):
-                # Return the full entry from the original list
-                return api_entries[selected_index]
-            else:
-                # Fallback to first entry if index is invalid
-                return api_entries[0]
-        else:
-            # Fallback to first entry if no valid JSON
-            return api_entries[0]
-            
-    except Exception as e:
-        print(f"Error using OpenAI API: {e}")
-        # Fallback to first entry in case of API error
-        return api_entries[0] if api_entries else {}
+@app.get("/readyz")
+async def readyz():
+    """Readiness probe: the OpenAI client has been built and the backend is warm."""
+    status = "ready" if startup_state["ready"] else ("error" if startup_state["error"] else "starting")
+    return JSONResponse(
+        content={"status": status, **startup_state},
+        status_code=200 if startup_state["ready"] else 503,
+    )
 
 
 @app.post("/proxy")
@@ -189,6 +105,7 @@ async def proxy(request: Request) -> Response:
         method = req_dict.get("method", "GET")
         headers = req_dict.get("headers", {})
         body = req_dict.get("body")
+        use_cache = req_dict.get("cache", PROXY_CACHE_ENABLED)
         
         # Store request information
         request_data = {
@@ -199,14 +116,18 @@ async def proxy(request: Request) -> Response:
         }
         
         
-        # Make the actual HTTP request
+        # Make the actual HTTP request, going through the response cache if enabled
         async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                content=body
-            )
+            if use_cache:
+                response, cache_status = await proxy_cache.fetch(client, method, url, headers, body)
+            else:
+                response = await client.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    content=body
+                )
+                cache_status = "bypass"
         
         # Parse the response body
         response_body = response.text
@@ -222,7 +143,9 @@ async def proxy(request: Request) -> Response:
             "server_response": {
                 "status_code": response.status_code,
                 "headers": dict(response.headers),
-                "body": response_json if response_json else response_body
+                "body": response_json if response_json else response_body,
+                "cache_hit": cache_status in ("hit", "revalidated"),
+                "cache_status": cache_status
             },
             "request_info": request_data
         }
@@ -341,7 +264,7 @@ async def finalize_upload(request: FinalizeUpload):
         shutil.rmtree(upload_dir)
 
 @app.get("/api/extract-api/", response_model=APIResponse)
-async def extract_api(fileId: str, description: str, selectedModel: str = 'o3-mini-2025-01-31'):
+async def extract_api(fileId: str, description: str, selectedModel: str = DEFAULT_MODEL):
     """Process HAR file and extract the most relevant API request based on description."""
     
     try:
@@ -367,22 +290,9 @@ async def extract_api(fileId: str, description: str, selectedModel: str = 'o3-mi
         # Generate curl command from the full entry
         curl_command = generate_curl_command(selected_entry)
         
-        # Extract request details
-        content_type = "Not specified"
-        for header in selected_entry["response"]["headers"]:
-            if header["name"].lower() == "content-type":
-                content_type = header["value"]
-                break
-        
         return APIResponse(
             curlCommand=curl_command,
-            requestDetails={
-                "method": selected_entry["request"]["method"],
-                "url": selected_entry["request"]["url"],
-                "contentType": content_type,
-                "responseStatus": selected_entry["response"]["status"],
-                "responseSize": selected_entry["response"].get("content", {}).get("size", 0)
-            }
+            requestDetails=extract_request_details(selected_entry)
         )
         
     except json.JSONDecodeError:
@@ -390,6 +300,13 @@ async def extract_api(fileId: str, description: str, selectedModel: str = 'o3-mi
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
+startup_state["import_seconds"] = round(time.perf_counter() - _import_started, 3)
+if startup_state["import_seconds"] > IMPORT_BUDGET_SECONDS:
+    print(
+        f"Warning: importing backend took {startup_state['import_seconds']}s, "
+        f"over the {IMPORT_BUDGET_SECONDS}s budget"
+    )
+
 def main():
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
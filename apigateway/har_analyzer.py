@@ -0,0 +1,191 @@
+"""HAR parsing and LLM request selection shared by the backend and the command line scripts.
+
+Importing this module has no side effects; the OpenAI client is built on first use.
+"""
+import asyncio
+import configparser
+import json
+import re
+import threading
+from typing import Any, Dict, List
+
+DEFAULT_MODEL = 'o3-mini-2025-01-31'
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the OpenAI client, reading config.ini and building it on first use."""
+    global _client
+    if _client is None:
+        # The warm-up thread and early requests may race to build the client
+        with _client_lock:
+            if _client is None:
+                # Imported here because the openai package alone takes ~0.5s to load
+                from openai import OpenAI
+
+                config = configparser.ConfigParser()
+                config.read('config.ini')
+                api_key = config.get('openai', 'api_key')
+                _client = OpenAI(api_key=api_key)
+    return _client
+
+
+def filter_har_entries(entries: List[Dict]) -> List[Dict]:
+    """Filter HAR entries to keep only API calls and remove HTML, CSS, etc."""
+    api_entries = []
+    
+    for entry in entries:
+        # Skip entries that don't have response
+        if "response" not in entry or "content" not in entry["response"]:
+            continue
+            
+        # Skip entries that return HTML
+        content_type = entry["response"].get("content", {}).get("mimeType", "")
+        if "html" in content_type.lower():
+            continue
+            
+        # Skip image, font, stylesheet requests
+        if any(x in content_type.lower() for x in ["image", "font", "css"]):
+            continue
+            
+        # Keep entries that are likely APIs
+        if (
+            "json" in content_type.lower() or 
+            "xml" in content_type.lower() or 
+            "javascript" in content_type.lower() or 
+            "api" in entry["request"]["url"].lower()
+        ):
+            api_entries.append(entry)
+    
+    return api_entries
+
+
+def generate_curl_command(entry: Dict) -> str:
+    """Generate a curl command from the full HAR entry."""
+    request = entry["request"]
+    method = request["method"]
+    url = request["url"]
+    
+    curl_parts = [f"curl -X {method} '{url}'"]
+    
+    # Add headers
+    for header in request["headers"]:
+        name = header["name"]
+        value = header["value"].replace("'", "'\\''")  # Escape single quotes
+        curl_parts.append(f"-H '{name}: {value}'")
+    
+    # Add data if present
+    if "postData" in request:
+        if "text" in request["postData"]:
+            data = request["postData"]["text"].replace("'", "'\\''")
+            curl_parts.append(f"-d '{data}'")
+        elif "params" in request["postData"]:
+            for param in request["postData"]["params"]:
+                name = param["name"]
+                value = param["value"].replace("'", "'\\''")
+                curl_parts.append(f"-F '{name}={value}'")
+    
+    return " \\\n  ".join(curl_parts)
+
+
+def extract_request_details(entry: Dict) -> Dict[str, Any]:
+    """Summarize the selected HAR entry for the API response."""
+    content_type = "Not specified"
+    for header in entry["response"]["headers"]:
+        if header["name"].lower() == "content-type":
+            content_type = header["value"]
+            break
+    
+    return {
+        "method": entry["request"]["method"],
+        "url": entry["request"]["url"],
+        "contentType": content_type,
+        "responseStatus": entry["response"]["status"],
+        "responseSize": entry["response"].get("content", {}).get("size", 0)
+    }
+
+
+async def analyze_with_llm(api_entries: List[Dict], description: str, selectedModel: str, raise_on_error: bool = False) -> Dict:
+    """Use OpenAI to select the most relevant API request from all entries.
+
+    Falls back to the first entry when the LLM call fails or its answer cannot be used,
+    unless raise_on_error is set, in which case the failure is raised instead.
+    """
+    # Create simplified entries for use in the LLM prompt to reduce token usage
+    simplified_entries = []
+    for i, entry in enumerate(api_entries):
+        simplified = {
+            "index": i,
+            "method": entry["request"]["method"],
+            "url": entry["request"]["url"],
+            "contentType": next((h["value"] for h in entry["request"]["headers"] 
+                             if h["name"].lower() == "content-type"), "None")
+        }
+        simplified_entries.append(simplified)
+    
+    # Prepare the prompt with all entries in simplified form
+    prompt = f"""
+        You are an expert at analyzing API requests. I need you to find the most relevant API request from a HAR file based on this description:
+
+        "{description}"
+
+        Here are all the API requests found in the HAR file (simplified to save tokens):
+        {json.dumps(simplified_entries, indent=2)}
+
+        Please identify the SINGLE most relevant request that best matches the description. 
+        Return ONLY a JSON object with the following structure:
+        {{
+        "selected_index": [index of the selected request in the provided array],
+        "reasoning": "Brief explanation of why this request matches the description"
+        }}
+        """
+
+    try:
+        # Build the client off the event loop if warm-up has not finished yet
+        client = await asyncio.to_thread(get_client)
+        if selectedModel == "gpt-4o-2024-08-06":
+            response = client.chat.completions.create(
+            model=selectedModel,
+            messages=[
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.7
+        )
+
+
+        else:
+            response = client.chat.completions.create(
+                model=selectedModel,
+                messages=[{"role": "user", "content": prompt}],
+            )
+        
+        result_text = response.choices[0].message.content
+        
+        # Use regex to extract JSON object from the response
+        json_match = re.search(r'\{[\s\S]*\}', result_text)
+        if json_match:
+            result = json.loads(json_match.group(0))
+            selected_index = result.get("selected_index")
+            
+            if selected_index is not None and 0 <= selected_index < len(api_entries):
+                # Return the full entry from the original list
+                return api_entries[selected_index]
+            elif raise_on_error:
+                raise ValueError(f"LLM selected an invalid index: {selected_index}")
+            else:
+                # Fallback to first entry if index is invalid
+                return api_entries[0]
+        elif raise_on_error:
+            raise ValueError("Could not parse LLM response as JSON")
+        else:
+            # Fallback to first entry if no valid JSON
+            return api_entries[0]
+            
+    except Exception as e:
+        if raise_on_error:
+            raise
+        print(f"Error using OpenAI API: {e}")
+        # Fallback to first entry in case of API error
+        return api_entries[0] if api_entries else {}
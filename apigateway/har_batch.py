@@ -0,0 +1,198 @@
+"""Process directories of HAR files headlessly and write the results as NDJSON.
+
+Every HAR file is paired with every description in the descriptions file
+(one per line, lines starting with # are ignored). Each output line is a
+JSON object with the HAR path, the description and either the generated
+curl command and request details or an error.
+
+Example:
+    python har_batch.py har_files/ "captures/**/*.har" -d descriptions.txt -o results.ndjson --resume
+"""
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from har_analyzer import DEFAULT_MODEL, analyze_with_llm, extract_request_details, filter_har_entries, generate_curl_command
+
+# Set by _init_worker; shared across the pool so the number of in-flight LLM calls stays bounded
+_llm_semaphore = None
+_max_concurrent_llm = 1
+
+
+def _init_worker(llm_semaphore, max_concurrent_llm: int) -> None:
+    global _llm_semaphore, _max_concurrent_llm
+    _llm_semaphore = llm_semaphore
+    _max_concurrent_llm = max_concurrent_llm
+
+
+def collect_har_files(inputs: List[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted, de-duplicated list of absolute HAR file paths.
+
+    Paths are absolute so that resume keys match however the inputs were spelled.
+    """
+    har_files = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            har_files.update(os.path.abspath(path) for path in Path(pattern).rglob("*.har"))
+        else:
+            har_files.update(os.path.abspath(path) for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+    return sorted(har_files)
+
+
+def load_descriptions(path: str) -> List[str]:
+    with open(path, "r") as file:
+        lines = (line.strip() for line in file)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def load_completed(output_path: str) -> Set[Tuple[str, str]]:
+    """Return the (har, description) pairs that already have a successful result."""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "r") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partially written line from an interrupted run
+                continue
+            if record.get("status") == "ok":
+                completed.add((record["har"], record["description"]))
+
+    return completed
+
+
+def process_har(har_path: str, descriptions: List[str], model: str) -> List[Dict]:
+    """Select the matching API request in one HAR file for each description."""
+    try:
+        with open(har_path, "r") as file:
+            har_data = json.load(file)
+        entries = har_data["log"]["entries"]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        return [_error_record(har_path, description, f"Invalid HAR file: {e}") for description in descriptions]
+
+    api_entries = filter_har_entries(entries)
+    if not api_entries:
+        return [_error_record(har_path, description, "No API requests found in the HAR file") for description in descriptions]
+
+    # Without a pool initializer (e.g. called directly) there is no shared limit to respect
+    llm_limit = _llm_semaphore if _llm_semaphore is not None else contextlib.nullcontext()
+
+    def select(description: str) -> Dict:
+        try:
+            with llm_limit:
+                # Fail instead of falling back to the first entry so the pair is retried on resume
+                selected_entry = asyncio.run(analyze_with_llm(api_entries, description, model, raise_on_error=True))
+            return {
+                "har": har_path,
+                "description": description,
+                "status": "ok",
+                "curlCommand": generate_curl_command(selected_entry),
+                "requestDetails": extract_request_details(selected_entry)
+            }
+        except Exception as e:
+            return _error_record(har_path, description, str(e))
+
+    # The OpenAI client is synchronous, so descriptions run on threads to keep several calls in flight per worker
+    with ThreadPoolExecutor(max_workers=min(len(descriptions), _max_concurrent_llm)) as threads:
+        return list(threads.map(select, descriptions))
+
+
+def _error_record(har_path: str, description: str, error: str) -> Dict:
+    return {"har": har_path, "description": description, "status": "error", "error": error}
+
+
+def run_batch(
+    har_files: List[str],
+    descriptions: List[str],
+    output_path: str,
+    model: str = DEFAULT_MODEL,
+    workers: Optional[int] = None,
+    max_concurrent_llm: int = 8,
+    resume: bool = False,
+) -> Dict[str, int]:
+    """Process every (HAR file, description) pair across a process pool, streaming results to output_path."""
+    completed = load_completed(output_path) if resume else set()
+
+    jobs = []
+    for har_path in har_files:
+        pending = [description for description in descriptions if (har_path, description) not in completed]
+        if pending:
+            jobs.append((har_path, pending))
+
+    counts = {"ok": 0, "error": 0, "skipped": len(har_files) * len(descriptions) - sum(len(p) for _, p in jobs)}
+    if not jobs:
+        return counts
+
+    with open(output_path, "a" if resume else "w") as output:
+        # Start on a fresh line if the previous run was interrupted mid-write
+        if resume and output.tell() > 0:
+            with open(output_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    output.write("\n")
+
+        llm_semaphore = multiprocessing.BoundedSemaphore(max_concurrent_llm)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(llm_semaphore, max_concurrent_llm)) as pool:
+            futures = {pool.submit(process_har, har_path, pending, model): har_path for har_path, pending in jobs}
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                har_path = futures[future]
+                try:
+                    records = future.result()
+                except Exception as e:
+                    records = [_error_record(har_path, description, str(e)) for description in dict(jobs)[har_path]]
+
+                for record in records:
+                    output.write(json.dumps(record) + "\n")
+                    counts[record["status"]] += 1
+                output.flush()
+
+                print(f"[{done}/{len(jobs)}] {har_path}", file=sys.stderr)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract API requests from many HAR files in parallel.")
+    parser.add_argument("inputs", nargs="+", help="HAR files, directories or glob patterns")
+    parser.add_argument("-d", "--descriptions", required=True, help="File with one description per line")
+    parser.add_argument("-o", "--output", required=True, help="NDJSON file to write results to")
+    parser.add_argument("-m", "--model", default=DEFAULT_MODEL, help="OpenAI model to use")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--max-concurrent-llm", type=int, default=8, help="Maximum number of LLM calls in flight across all workers")
+    parser.add_argument("--resume", action="store_true", help="Skip pairs that already succeeded in the output file")
+    args = parser.parse_args()
+
+    har_files = collect_har_files(args.inputs)
+    descriptions = load_descriptions(args.descriptions)
+    if not har_files:
+        parser.error("No HAR files found")
+    if not descriptions:
+        parser.error("No descriptions found")
+
+    print(f"Processing {len(har_files)} HAR files x {len(descriptions)} descriptions", file=sys.stderr)
+    counts = run_batch(
+        har_files,
+        descriptions,
+        args.output,
+        model=args.model,
+        workers=args.workers,
+        max_concurrent_llm=args.max_concurrent_llm,
+        resume=args.resume,
+    )
+    print(f"Done: {counts['ok']} ok, {counts['error']} errors, {counts['skipped']} skipped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,48 +3,11 @@ import os
 import re
 from typing import Dict, List, Any
 from dotenv import load_dotenv
-from openai import OpenAI
+from har_analyzer import filter_har_entries, generate_curl_command, get_client
 
 # Load environment variables
 load_dotenv()
 
-# Set up OpenAI client
-import configparser
-config = configparser.ConfigParser()
-config.read('config.ini')
-api_key = config.get('openai', 'api_key')
-client = OpenAI(api_key=api_key)
-
-def filter_har_entries(entries: List[Dict]) -> List[Dict]:
-    """Filter HAR entries to keep only API calls and remove HTML, CSS, etc."""
-    api_entries = []
-    
-    for entry in entries:
-        # Skip entries that don't have response
-        if "response" not in entry or "content" not in entry["response"]:
-            continue
-            
-        # Skip entries that return HTML
-        content_type = entry["response"].get("content", {}).get("mimeType", "")
-        if "html" in content_type.lower():
-            continue
-            
-        # Skip image, font, stylesheet requests
-        if any(x in content_type.lower() for x in ["image", "font", "css"]):
-            continue
-            
-        # Keep entries that are likely APIs
-        if (
-            "json" in content_type.lower() or 
-            "xml" in content_type.lower() or 
-            "javascript" in content_type.lower() or 
-            "api" in entry["request"]["url"].lower()
-        ):
-            api_entries.append(entry)
-    
-    return api_entries
-
-
 def extract_key_request_info(entry: Dict) -> Dict:
     """Extract key information from a HAR request entry to reduce token usage."""
     request = entry["request"]
@@ -87,34 +50,6 @@ def extract_key_request_info(entry: Dict) -> Dict:
     }
 
 
-def generate_curl_command(entry: Dict) -> str:
-    """Generate a curl command from the full HAR entry."""
-    request = entry["request"]
-    method = request["method"]
-    url = request["url"]
-    
-    curl_parts = [f"curl -X {method} '{url}'"]
-    
-    # Add headers
-    for header in request["headers"]:
-        name = header["name"]
-        value = header["value"].replace("'", "'\\''")  # Escape single quotes
-        curl_parts.append(f"-H '{name}: {value}'")
-    
-    # Add data if present
-    if "postData" in request:
-        if "text" in request["postData"]:
-            data = request["postData"]["text"].replace("'", "'\\''")
-            curl_parts.append(f"-d '{data}'")
-        elif "params" in request["postData"]:
-            for param in request["postData"]["params"]:
-                name = param["name"]
-                value = param["value"].replace("'", "'\\''")
-                curl_parts.append(f"-F '{name}={value}'")
-    
-    return " \\\n  ".join(curl_parts)
-
-
 def analyze_with_llm(api_entries: List[Dict], description: str) -> Dict:
     """Use OpenAI to select the most relevant API request from all entries."""
     # Create simplified entries for use in the LLM prompt to reduce token usage
@@ -148,7 +83,7 @@ Return ONLY a JSON object with the following structure:
 
     try:
         # Use the new OpenAI client API format
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4o-2024-08-06",  # Use the model specified in requirements
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
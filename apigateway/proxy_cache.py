@@ -0,0 +1,228 @@
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+SAFE_METHODS = {"GET", "HEAD"}
+CONDITIONAL_REQUEST_HEADERS = {"if-none-match", "if-modified-since", "if-match", "if-unmodified-since", "if-range"}
+CACHEABLE_STATUS_CODES = {200, 203, 204, 300, 301, 404, 410}
+
+# Headers a 304 Not Modified is allowed to refresh on the stored response
+REVALIDATION_HEADERS = ["cache-control", "date", "etag", "expires", "last-modified", "vary", "age"]
+
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a dict of lower-cased directives."""
+    directives: Dict[str, Optional[str]] = {}
+    if not value:
+        return directives
+
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else None
+
+    return directives
+
+
+def _parse_seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class CacheEntry:
+    """A stored upstream response together with the data needed to decide its freshness."""
+
+    def __init__(self, response: httpx.Response, request_headers: Dict[str, str]):
+        self.response = response
+        self.stored_at = time.time()
+        # Request header values for every header the upstream says the response varies on
+        self.vary = {name: request_headers.get(name) for name in self.vary_names()}
+        self.size = len(response.content) + sum(len(k) + len(v) for k, v in response.headers.items())
+
+    def vary_names(self) -> List[str]:
+        vary = self.response.headers.get("vary", "")
+        return [name.strip().lower() for name in vary.split(",") if name.strip()]
+
+    def matches(self, request_headers: Dict[str, str]) -> bool:
+        return all(request_headers.get(name) == value for name, value in self.vary.items())
+
+    def freshness_lifetime(self) -> int:
+        directives = parse_cache_control(self.response.headers.get("cache-control"))
+        if "no-cache" in directives:
+            return 0
+
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                return _parse_seconds(directives[name]) or 0
+
+        expires = _parse_http_date(self.response.headers.get("expires"))
+        if expires is not None:
+            date = _parse_http_date(self.response.headers.get("date")) or self.stored_at
+            return max(int(expires - date), 0)
+
+        # No explicit freshness: only served after revalidation
+        return 0
+
+    def current_age(self) -> float:
+        age = _parse_seconds(self.response.headers.get("age")) or 0
+        return age + (time.time() - self.stored_at)
+
+    def is_fresh(self) -> bool:
+        return self.current_age() < self.freshness_lifetime()
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers that revalidate this entry with the upstream."""
+        headers = {}
+        if "etag" in self.response.headers:
+            headers["If-None-Match"] = self.response.headers["etag"]
+        if "last-modified" in self.response.headers:
+            headers["If-Modified-Since"] = self.response.headers["last-modified"]
+        return headers
+
+    def refresh(self, not_modified: httpx.Response) -> None:
+        """Merge the headers of a 304 response into the stored response."""
+        for name in REVALIDATION_HEADERS:
+            if name in not_modified.headers:
+                self.response.headers[name] = not_modified.headers[name]
+        if "age" not in not_modified.headers:
+            self.response.headers.pop("age", None)
+        self.stored_at = time.time()
+
+
+class ProxyCache:
+    """Byte-bounded LRU cache of upstream responses to safe /proxy requests.
+
+    Entries are keyed on method, URL and the values of ``vary_headers``.
+    Upstream Cache-Control, Expires, ETag and Last-Modified headers decide
+    whether a stored response can be served directly or must first be
+    revalidated with a conditional request.
+    """
+
+    def __init__(self, max_bytes: int, vary_headers: List[str]):
+        self.max_bytes = max_bytes
+        self.vary_headers = [name.strip().lower() for name in vary_headers if name.strip()]
+        self.current_bytes = 0
+        self.entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+
+    def make_key(self, method: str, url: str, request_headers: Dict[str, str]) -> Tuple:
+        return (
+            method.upper(),
+            str(httpx.URL(url)),
+            tuple(request_headers.get(name) for name in self.vary_headers),
+        )
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, entry: CacheEntry) -> None:
+        self.remove(key)
+        if entry.size > self.max_bytes:
+            return
+
+        self.entries[key] = entry
+        self.current_bytes += entry.size
+
+        # Evict least recently used entries until we are back under budget
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+
+    def remove(self, key: Tuple) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def is_storable(self, response: httpx.Response, request_headers: Dict[str, str]) -> bool:
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return False
+        if "no-store" in parse_cache_control(request_headers.get("cache-control")):
+            return False
+
+        directives = parse_cache_control(response.headers.get("cache-control"))
+        # This cache is shared by every /proxy caller
+        if "no-store" in directives or "private" in directives:
+            return False
+        if "authorization" in request_headers and not any(
+            name in directives for name in ("public", "s-maxage", "must-revalidate")
+        ):
+            return False
+        # A stored Set-Cookie would hand one caller's session to the next
+        if ("set-cookie" in response.headers or "set-cookie2" in response.headers) and "public" not in directives:
+            return False
+        if response.headers.get("vary", "").strip() == "*":
+            return False
+
+        # Without freshness information or a validator the entry could never be served
+        has_freshness = any(name in directives for name in ("max-age", "s-maxage")) or "expires" in response.headers
+        has_validator = "etag" in response.headers or "last-modified" in response.headers
+        return has_freshness or has_validator
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        body: Optional[str] = None,
+    ) -> Tuple[httpx.Response, str]:
+        """Send a request through the cache.
+
+        Returns the response and a cache status of "hit", "revalidated",
+        "miss" or "bypass".
+        """
+        # Requests carrying their own validators expect the upstream's answer to them (e.g. a 304)
+        is_conditional = any(name.lower() in CONDITIONAL_REQUEST_HEADERS for name in headers)
+        if method.upper() not in SAFE_METHODS or body or is_conditional:
+            response = await client.request(method=method, url=url, headers=headers, content=body)
+            return response, "bypass"
+
+        request_headers = {name.lower(): value for name, value in headers.items()}
+        request_directives = parse_cache_control(request_headers.get("cache-control"))
+        key = self.make_key(method, url, request_headers)
+        entry = self.get(key)
+        if entry is not None and not entry.matches(request_headers):
+            entry = None
+
+        if entry is not None and entry.is_fresh() and "no-cache" not in request_directives:
+            return entry.response, "hit"
+
+        conditional_headers = dict(headers)
+        if entry is not None:
+            conditional_headers.update(entry.validators())
+
+        response = await client.request(method=method, url=url, headers=conditional_headers)
+
+        if entry is not None and response.status_code == 304:
+            entry.refresh(response)
+            self.put(key, entry)
+            return entry.response, "revalidated"
+
+        if self.is_storable(response, request_headers):
+            self.put(key, CacheEntry(response, request_headers))
+        else:
+            self.remove(key)
+
+        return response, "miss"
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+import httpx
+
+from proxy_cache import CacheEntry, ProxyCache
+
+# Number of requests the local upstream has received, per path
+upstream_hits: Dict[str, int] = {}
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """Local upstream serving one path per caching behaviour under test."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        upstream_hits[self.path] = upstream_hits.get(self.path, 0) + 1
+        headers = {}
+
+        if self.path == "/fresh":
+            headers["Cache-Control"] = "max-age=60"
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("ETag", '"v1"')
+                self.end_headers()
+                return
+            headers["Cache-Control"] = "no-cache"
+            headers["ETag"] = '"v1"'
+        elif self.path == "/private":
+            headers["Cache-Control"] = "private, max-age=60"
+        elif self.path == "/set-cookie":
+            headers["Cache-Control"] = "max-age=60"
+            headers["Set-Cookie"] = f"session=user{upstream_hits[self.path]}"
+        elif self.path == "/authorized":
+            headers["Cache-Control"] = "max-age=60"
+            headers["X-User"] = self.headers.get("Authorization", "")
+
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        upstream_hits[self.path] = upstream_hits.get(self.path, 0) + 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Cache-Control", "max-age=60")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def check(name: str, condition: bool, failures: list) -> None:
+    print(f"{'PASS' if condition else 'FAIL'}: {name}")
+    if not condition:
+        failures.append(name)
+
+
+async def check_fetch(base_url: str, failures: list) -> None:
+    # Leave authorization out of the vary headers so the shared-cache rules are exercised
+    cache = ProxyCache(max_bytes=1024 * 1024, vary_headers=["accept"])
+
+    async with httpx.AsyncClient() as client:
+        fetch = lambda path, method="GET", headers=None, body=None: cache.fetch(
+            client, method, base_url + path, headers or {}, body
+        )
+
+        statuses = [(await fetch("/fresh"))[1] for _ in range(2)]
+        check("max-age response is served from cache", statuses == ["miss", "hit"] and upstream_hits["/fresh"] == 1, failures)
+
+        first, _ = await fetch("/etag")
+        second, status = await fetch("/etag")
+        check(
+            "ETag response is revalidated with a 304",
+            status == "revalidated" and second.status_code == 200 and second.content == first.content
+            and upstream_hits["/etag"] == 2,
+            failures,
+        )
+
+        response, status = await fetch("/etag", headers={"If-None-Match": '"v1"'})
+        check(
+            "client conditional request bypasses the cache and sees the upstream 304",
+            status == "bypass" and response.status_code == 304,
+            failures,
+        )
+
+        statuses = [(await fetch("/plain"))[1] for _ in range(2)]
+        check("response without validators is not stored", statuses == ["miss", "miss"] and upstream_hits["/plain"] == 2, failures)
+
+        statuses = [(await fetch("/fresh", method="POST", body="{}"))[1] for _ in range(2)]
+        check("POST bypasses the cache", statuses == ["bypass", "bypass"] and upstream_hits["/fresh"] == 3, failures)
+
+        statuses = [(await fetch("/private"))[1] for _ in range(2)]
+        check("private response is not stored", statuses == ["miss", "miss"], failures)
+
+        await fetch("/set-cookie")
+        response, status = await fetch("/set-cookie")
+        check(
+            "response setting a cookie is not shared",
+            status == "miss" and response.headers["set-cookie"] == "session=user2",
+            failures,
+        )
+
+        await fetch("/authorized", headers={"Authorization": "alice"})
+        response, status = await fetch("/authorized", headers={"Authorization": "bob"})
+        check(
+            "response to an authorized request is not shared",
+            status == "miss" and response.headers["x-user"] == "bob",
+            failures,
+        )
+
+
+def check_lru(failures: list) -> None:
+    make_entry = lambda size: CacheEntry(
+        httpx.Response(200, headers={"cache-control": "max-age=60"}, content=b"x" * size), {}
+    )
+    entry_size = make_entry(100).size
+    cache = ProxyCache(max_bytes=2 * entry_size, vary_headers=[])
+    key = lambda path: cache.make_key("GET", f"http://upstream{path}", {})
+
+    cache.put(key("/a"), make_entry(100))
+    cache.put(key("/b"), make_entry(100))
+    cache.get(key("/a"))
+    cache.put(key("/c"), make_entry(100))
+    check(
+        "least recently used entry is evicted at the byte bound",
+        list(cache.entries) == [key("/a"), key("/c")] and cache.current_bytes <= cache.max_bytes,
+        failures,
+    )
+
+    cache.put(key("/big"), make_entry(10 * entry_size))
+    check("entry larger than the byte bound is not stored", key("/big") not in cache.entries, failures)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Testing proxy cache against local upstream at {base_url}")
+
+    failures = []
+    try:
+        asyncio.run(check_fetch(base_url, failures))
+        check_lru(failures)
+    finally:
+        server.shutdown()
+
+    print(f"\n{len(failures)} check(s) failed" if failures else "\nAll checks passed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
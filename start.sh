@@ -3,9 +3,35 @@
 # Start the FastAPI backend
 cd /app/backend
 python backend.py &
+backend_pid=$!
 
-# Wait a moment to ensure backend starts
-sleep 5
+# Wait until the backend reports it is ready (give up after READY_TIMEOUT seconds)
+READY_TIMEOUT=${READY_TIMEOUT:-30}
+deadline=$((SECONDS + READY_TIMEOUT))
+while true; do
+  if ! kill -0 $backend_pid 2> /dev/null; then
+    echo "Backend exited before becoming ready"
+    exit 1
+  fi
+
+  readiness=$(curl -s --max-time 1 http://localhost:8000/readyz)
+  case "$readiness" in
+    *'"status":"ready"'*)
+      break
+      ;;
+    *'"status":"error"'*)
+      echo "Backend failed to start: $readiness"
+      kill $backend_pid
+      exit 1
+      ;;
+  esac
+
+  if [ $SECONDS -ge $deadline ]; then
+    echo "Backend not ready after ${READY_TIMEOUT}s, starting frontend anyway"
+    break
+  fi
+  sleep 0.2
+done
 
 # Start the Next.js frontend
 cd /app/frontend